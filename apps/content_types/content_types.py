@@ -12,6 +12,7 @@ from apps.desks import remove_profile_from_desks
 from eve.utils import ParsedRequest
 from superdesk.resource import build_custom_hateoas
 from flask_babel import _
+from typing import Any, Dict, FrozenSet
 from superdesk.utc import utcnow
 
 
@@ -24,6 +25,13 @@ REQUIRED_FIELDS = (
     "embargoed",
 )
 
+# Fields that can be added to article without being added to CP eg: using widgets
+ALLOWED_FIELDS = frozenset(["attachments", "refs", "place", "organisation", "person"])
+
+#: fields disabled by content profile schema, keyed by ``(profile _id, _etag, _updated)``
+_disabled_fields_cache: Dict[Any, FrozenSet[str]] = {}
+DISABLED_FIELDS_CACHE_SIZE = 64
+
 # Valid editor keys
 EDITOR_ATTRIBUTES = (
     "order",
@@ -573,17 +581,41 @@ def apply_schema(item):
 
     :param item: item to apply schema to
     """
-    # fields that can be added to article without being added to CP eg: using widgets
-    allowed_keys = ["attachments", "refs", "place", "organisation", "person"]
-
     if item.get("type") == "event":
         return item.copy()
     try:
         profile = get_resource_service("content_types").find_one(req=None, _id=item["profile"])
         schema = profile["schema"]
     except Exception:
+        profile = None
         schema = DEFAULT_SCHEMA
-    return {key: val for key, val in item.items() if is_enabled(key, schema) or key in allowed_keys}
+    disabled = get_disabled_fields(profile, schema)
+    return {key: val for key, val in item.items() if key not in disabled or key in ALLOWED_FIELDS}
+
+
+def get_disabled_fields(profile, schema):
+    """Return fields which are not enabled using given schema.
+
+    Only fields from default schema can be disabled, so the result is computed
+    once per profile version and reused for all items using it.
+
+    :param profile: content profile or ``None`` for default schema
+    :param schema: schema dict
+    """
+    if profile is None:
+        key = None
+    elif profile.get("_etag"):
+        # ``_etag`` is not changed by every update (eg. ``app:initialize_data`` or ``IF_MATCH = False``)
+        key = (profile.get(config.ID_FIELD), profile["_etag"], profile.get(config.LAST_UPDATED))
+    else:
+        return frozenset(field for field in DEFAULT_SCHEMA if not is_enabled(field, schema))
+    disabled_fields = _disabled_fields_cache.get(key)
+    if disabled_fields is None:
+        disabled_fields = frozenset(field for field in DEFAULT_SCHEMA if not is_enabled(field, schema))
+        if len(_disabled_fields_cache) >= DISABLED_FIELDS_CACHE_SIZE:
+            _disabled_fields_cache.clear()
+        _disabled_fields_cache[key] = disabled_fields
+    return disabled_fields
 
 
 def remove_profile_from_templates(item):
@@ -12,7 +12,7 @@ import logging
 from flask import current_app as app
 from superdesk.errors import SuperdeskApiError
 import superdesk
-from .ldap import ADAuth, add_default_values, get_user_query
+from .ldap import ADAuth, add_default_values, find_user
 from flask_babel import _
 
 logger = logging.getLogger(__name__)
@@ -60,6 +60,9 @@ class ImportUserProfileFromADCommand(superdesk.Command):
             settings["LDAP_USER_FILTER"],
             settings["LDAP_USER_ATTRIBUTES"],
             settings["LDAP_FQDN"],
+            bind_user=settings.get("LDAP_BIND_USER"),
+            bind_password=settings.get("LDAP_BIND_PASSWORD"),
+            pool_size=settings.get("LDAP_POOL_SIZE", 10),
         )
 
         user_data = ad_auth.authenticate_and_fetch_profile(ad_username, ad_password, username)
@@ -68,7 +71,7 @@ class ImportUserProfileFromADCommand(superdesk.Command):
             raise SuperdeskApiError.notFoundError("Username not found")
 
         # Check if User Profile already exists in Mongo
-        user = superdesk.get_resource_service("users").find_one(req=None, **get_user_query(username))
+        user = find_user(username)
 
         if user:
             superdesk.get_resource_service("users").patch(user.get("_id"), user_data)
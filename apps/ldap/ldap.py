@@ -10,7 +10,9 @@
 
 import logging
 import re
-from ldap3 import Server, Connection, SUBTREE
+import threading
+import time
+from ldap3 import Server, ServerPool, Connection, SUBTREE, NONE, REUSABLE
 from ldap3.core.exceptions import LDAPException
 from apps.auth.service import AuthService
 from superdesk.users.services import UsersService
@@ -25,6 +27,53 @@ from flask_babel import _
 
 logger = logging.getLogger(__name__)
 
+#: servers shared by all :class:`ADAuth` instances, keyed by ``(host, port)``
+_servers = {}
+
+#: server pools used by service account connections, keyed by ``(host, port)``
+_server_pools = {}
+
+#: pooled service account connections, keyed by ``(host, port, bind_user)``
+_service_connections = {}
+_service_connections_lock = threading.Lock()
+
+#: user profiles fetched after a successful bind,
+#: keyed by ``(host, port, base_filter, user_filter, username, username_for_profile)``
+_profile_cache = {}
+PROFILE_CACHE_SIZE = 4096
+
+#: max time in seconds for the server to spend on profile search
+SEARCH_TIME_LIMIT = 5
+
+
+def get_server(host, port):
+    """Get server for given host and port.
+
+    Server info (DSE and schema) is not fetched as it's not needed for authentication.
+
+    :param host: ldap server
+    :param port: ldap server port
+    """
+    key = (host, port)
+    if key not in _servers:
+        _servers[key] = Server(host, port, get_info=NONE)
+    return _servers[key]
+
+
+def get_server_pool(host, port):
+    """Get server pool for given host and port.
+
+    Only use it for long lived connections, server pool keeps reference
+    to every connection created with it.
+
+    :param host: ldap server
+    :param port: ldap server port
+    """
+    key = (host, port)
+    if key not in _server_pools:
+        _server_pools[key] = ServerPool([get_server(host, port)], active=1)
+    return _server_pools[key]
+
 
 class ImportUserProfileResource(Resource):
     """
@@ -53,7 +102,19 @@ class ADAuth:
     Handles Authentication against Active Directory.
     """
 
-    def __init__(self, host, port, base_filter, user_filter, profile_attributes, fqdn):
+    def __init__(
+        self,
+        host,
+        port,
+        base_filter,
+        user_filter,
+        profile_attributes,
+        fqdn,
+        bind_user=None,
+        bind_password=None,
+        pool_size=10,
+        profile_cache_ttl=0,
+    ):
         """Initializes the AD Server
 
         :param host: ldap server. for example ldap://aap.com.au
@@ -61,13 +122,47 @@ class ADAuth:
         :param base_filter:
         :param user_filter:
         :param profile_attributes:
+        :param fqdn:
+        :param bind_user: service account used to search for profiles, if not set the user credentials are used
+        :param bind_password: service account password
+        :param pool_size: size of the service account connection pool
+        :param profile_cache_ttl: for how many seconds to cache fetched profiles, ``0`` disables the cache
         """
-        self.ldap_server = Server(host, (port if port is not None else 389))
+        self.host = host
+        self.port = port if port is not None else 389
+        self.ldap_server = get_server(self.host, self.port)
 
         self.fqdn = fqdn
         self.base_filter = base_filter
         self.user_filter = user_filter
         self.profile_attrs = profile_attributes
+        self.attribute_keys = list(profile_attributes.keys())
+        self.bind_user = bind_user
+        self.bind_password = bind_password
+        self.pool_size = pool_size
+        self.profile_cache_ttl = profile_cache_ttl
+
+    def get_service_connection(self):
+        """Get pooled connection bound with the service account.
+
+        The connection is shared between requests and is never rebound, it's only used for searching.
+        """
+        key = (self.host, self.port, self.bind_user)
+        with _service_connections_lock:
+            if key not in _service_connections:
+                _service_connections[key] = Connection(
+                    get_server_pool(self.host, self.port),
+                    user=self.bind_user,
+                    password=self.bind_password,
+                    client_strategy=REUSABLE,
+                    auto_bind=True,
+                    # ldap3 shares pools by name, so each server and bind user needs its own
+                    pool_name="superdesk:{}:{}:{}".format(*key),
+                    pool_size=self.pool_size,
+                    pool_lifetime=600,
+                    pool_keepalive=30,
+                )
+            return _service_connections[key]
 
     def authenticate_and_fetch_profile(self, username, password, username_for_profile=None):
         """Authenticates a user with credentials username and password against AD.
@@ -88,43 +183,113 @@ class ADAuth:
             username = username + "@" + self.fqdn
 
         try:
-            ldap_conn = Connection(self.ldap_server, auto_bind=True, user=username, password=password)
+            user_conn = Connection(self.ldap_server, auto_bind=True, user=username, password=password)
 
-            user_filter = self.user_filter.format(username, username_for_profile.split("@")[0])
-            logger.info("base filter:{} user filter:{}".format(self.base_filter, user_filter))
-
-            with ldap_conn:
-                result = ldap_conn.search(
-                    self.base_filter, user_filter, search_scope=SUBTREE, attributes=list(self.profile_attrs.keys())
-                )
+            # ``with`` doesn't unbind connection which was bound before entering it
+            try:
+                # cached profile also means passed group membership check, so it's only valid for same config
+                cache_key = (self.host, self.port, self.base_filter, self.user_filter, username, username_for_profile)
+                response = self.get_cached_profile(cache_key)
+                if response is None:
+                    response = self.fetch_profile(user_conn, username, username_for_profile)
+                    self.set_cached_profile(cache_key, response)
+                return dict(response)
+            finally:
+                user_conn.unbind()
+        except LDAPException as e:
+            raise CredentialsAuthError(credentials={"username": username}, error=e)
 
-                if not result:
-                    # the search returns false in case of user not a security group member.
-                    raise CredentialsAuthError(
-                        credentials={"username": username},
-                        message=_("User does not belong to security Group or could not find the user profile."),
-                    )
+    def fetch_profile(self, user_conn, username, username_for_profile):
+        """Search for a profile of a user identified by username_for_profile.
 
-                response = dict()
-                user_profile = ldap_conn.response[0]["attributes"]
+        Uses the pooled service account connection if configured, otherwise the connection bound as user.
 
-                for ad_profile_attr, sd_profile_attr in self.profile_attrs.items():
-                    response[sd_profile_attr] = (
-                        user_profile[ad_profile_attr] if user_profile.__contains__(ad_profile_attr) else ""
-                    )
+        :param user_conn: connection bound with user credentials
+        :param username: LDAP username
+        :param username_for_profile: Username of the profile to be fetched
+        :return: user profile base on the LDAP_USER_ATTRIBUTES
+        """
+        user_filter = self.user_filter.format(username, username_for_profile.partition("@")[0])
+        logger.info("base filter:{} user filter:{}".format(self.base_filter, user_filter))
+
+        if self.bind_user:
+            ldap_conn = self.get_service_connection()
+            msg_id = ldap_conn.search(
+                self.base_filter,
+                user_filter,
+                search_scope=SUBTREE,
+                attributes=self.attribute_keys,
+                size_limit=1,
+                time_limit=SEARCH_TIME_LIMIT,
+            )
+            # don't wait for the server longer than it should spend on the search
+            entries, _result = ldap_conn.get_response(msg_id, timeout=SEARCH_TIME_LIMIT)
+        else:
+            result = user_conn.search(
+                self.base_filter,
+                user_filter,
+                search_scope=SUBTREE,
+                attributes=self.attribute_keys,
+                size_limit=1,
+                time_limit=SEARCH_TIME_LIMIT,
+            )
+            entries = user_conn.response if result else None
 
-                    response[sd_profile_attr] = (
-                        response[sd_profile_attr][0]
-                        if isinstance(response[sd_profile_attr], list)
-                        else response[sd_profile_attr]
-                    )
+        if not entries:
+            # the search returns false in case of user not a security group member.
+            raise CredentialsAuthError(
+                credentials={"username": username},
+                message=_("User does not belong to security Group or could not find the user profile."),
+            )
 
-                return response
-        except LDAPException as e:
-            raise CredentialsAuthError(credentials={"username": username}, error=e)
+        user_profile = entries[0]["attributes"]
+        return {
+            sd_profile_attr: unwrap_attribute_value(user_profile.get(ad_profile_attr, ""))
+            for ad_profile_attr, sd_profile_attr in self.profile_attrs.items()
+        }
+
+    def get_cached_profile(self, key):
+        """Get profile from cache if it's not expired yet."""
+        if not self.profile_cache_ttl:
+            return None
+        cached = _profile_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def set_cached_profile(self, key, profile):
+        """Store profile in cache for ``profile_cache_ttl`` seconds."""
+        if not self.profile_cache_ttl:
+            return
+        if len(_profile_cache) >= PROFILE_CACHE_SIZE:
+            _profile_cache.clear()
+        _profile_cache[key] = (time.monotonic() + self.profile_cache_ttl, profile)
 
 
 class ADAuthService(AuthService):
+    _ad_auth = None
+
+    def get_ad_auth(self):
+        """Get :class:`ADAuth` configured using app settings.
+
+        It's created only once, settings don't change while app is running.
+        """
+        if self._ad_auth is None:
+            settings = app.settings
+            self._ad_auth = ADAuth(
+                settings["LDAP_SERVER"],
+                settings["LDAP_SERVER_PORT"],
+                settings["LDAP_BASE_FILTER"],
+                settings["LDAP_USER_FILTER"],
+                settings["LDAP_USER_ATTRIBUTES"],
+                settings["LDAP_FQDN"],
+                bind_user=settings.get("LDAP_BIND_USER"),
+                bind_password=settings.get("LDAP_BIND_PASSWORD"),
+                pool_size=settings.get("LDAP_POOL_SIZE", 10),
+                profile_cache_ttl=settings.get("LDAP_PROFILE_CACHE_TTL", 0),
+            )
+        return self._ad_auth
+
     def on_create(self, docs):
 
         user_service = get_resource_service("users")
@@ -136,21 +301,14 @@ class ADAuthService(AuthService):
 
             self.set_auth_default(doc, user["_id"])
 
-    def authenticate(self, credentials):
+    def authenticate(self, credentials, update_existing=True):
         """Authenticates the user against Active Directory
 
         :param credentials: an object having "username" and "password" attributes
+        :param update_existing: update existing user with the profile fetched from AD
         :return: if success returns User object, otherwise throws Error
         """
-        settings = app.settings
-        ad_auth = ADAuth(
-            settings["LDAP_SERVER"],
-            settings["LDAP_SERVER_PORT"],
-            settings["LDAP_BASE_FILTER"],
-            settings["LDAP_USER_FILTER"],
-            settings["LDAP_USER_ATTRIBUTES"],
-            settings["LDAP_FQDN"],
-        )
+        ad_auth = self.get_ad_auth()
 
         username = credentials.get("username")
         password = credentials.get("password")
@@ -167,9 +325,7 @@ class ADAuthService(AuthService):
         if "username" in user_data:
             profile_to_import = user_data.pop("username", None)
 
-        query = get_user_query(profile_to_import)
-
-        user = superdesk.get_resource_service("users").find_one(req=None, **query)
+        user = find_user(profile_to_import)
 
         if (
             app.settings.get("LDAP_SET_DISPLAY_NAME", False)
@@ -185,9 +341,10 @@ class ADAuthService(AuthService):
                 user_data, profile_to_import, user_type=None if "user_type" not in user_data else user_data["user_type"]
             )
             user = user_data
-        else:
+        elif update_existing:
             superdesk.get_resource_service("users").patch(user.get("_id"), user_data)
-            user = superdesk.get_resource_service("users").find_one(req=None, **query)
+            # patch adds ``_etag`` and ``_updated`` to updates, so no need to fetch the user again
+            user.update(user_data)
 
         return user
 
@@ -206,7 +363,8 @@ class ImportUserProfileService(UsersService):
             try:
                 # authenticate on error sends 401 and the client is redirected to login.
                 # but in case import user profile from Active Directory 403 should be fine.
-                user = get_resource_service("auth_db").authenticate(doc)
+                # existing user is rejected below so there is no need to update it
+                user = get_resource_service("auth_db").authenticate(doc, update_existing=False)
             except CredentialsAuthError:
                 raise SuperdeskApiError.forbiddenError(message=_("Invalid Credentials."), payload={"credentials": 1})
 
@@ -233,11 +391,41 @@ def add_default_values(doc, user_name, user_type, **kwargs):
     doc.update(**kwargs)
 
 
+def unwrap_attribute_value(value):
+    """Get single value for ldap attribute which can be multi valued."""
+    if isinstance(value, list):
+        return value[0] if value else ""
+    return "" if value is None else value
+
+
 def get_user_query(username):
     """Get the user query.
 
+    Uses lowercase username so the lookup is case insensitive and can use an index.
+
     :param str username:
     :return dict: query
     """
-    pattern = "^{}$".format(re.escape(username.strip()))
-    return {"username": re.compile(pattern, re.IGNORECASE)}
+    return {"username_lower": username.strip().lower()}
+
+
+def find_user(username):
+    """Find user by username ignoring case.
+
+    Users without ``username_lower``, created before ``data:upgrade`` was run
+    or not via users service, are looked up using case insensitive regex
+    and get ``username_lower`` set so next lookup can use the index.
+
+    :param str username:
+    :return dict: user or ``None``
+    """
+    users_service = superdesk.get_resource_service("users")
+    user = users_service.find_one(req=None, **get_user_query(username))
+    if user is None:
+        username_re = re.compile("^{}$".format(re.escape(username.strip())), re.IGNORECASE)
+        user = users_service.find_one(req=None, username=username_re)
+        if user and not user.get("username_lower"):
+            updates = {"username_lower": user["username"].lower()}
+            users_service.system_update(user["_id"], updates, user, push_notification=False)
+            user.update(updates)
+    return user
@@ -12,9 +12,11 @@
 
 import eve
 import blinker
+import weakref
+import importlib
 import logging as logging_lib
 
-from typing import Any, Dict, NamedTuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 from flask import abort, json, Blueprint, current_app
 from flask_babel.speaklater import LazyString
 from flask_script import Command as BaseCommand, Option
@@ -27,11 +29,41 @@ from .datalayer import SuperdeskDataLayer  # noqa
 from .services import BaseService as Service  # noqa
 from .resource import Resource  # noqa
 from .privilege import privilege, intrinsic_privilege, get_intrinsic_privileges  # noqa
-from .workflow import *  # noqa
-from .signals import *  # noqa
 from apps.common.models.base_model import BaseModel
 from apps.common.components.base_component import BaseComponent
 
+if TYPE_CHECKING:
+    # keep lazily imported names (see ``_LAZY_ATTRIBUTES``) visible for type checkers
+    from .search_provider import SearchProvider  # noqa
+    from apps.search_providers import register_search_provider  # noqa
+    from .workflow import (  # noqa
+        workflow_state,
+        get_workflow_states,
+        allowed_workflow_states,
+        workflow_action,
+        get_workflow_actions,
+        is_workflow_state_transition_valid,
+        set_default_state,
+    )
+    from .signals import (  # noqa
+        item_create,
+        item_publish,
+        item_published,
+        item_update,
+        item_updated,
+        item_fetched,
+        item_move,
+        item_moved,
+        item_rewrite,
+        item_validate,
+        item_routed,
+        item_duplicate,
+        item_duplicated,
+        archived_item_removed,
+        item_resend,
+        item_resent,
+    )
+
 __version__ = "2.6.0rc3"
 
 API_NAME = "Superdesk API"
@@ -47,6 +79,37 @@ default_user_preferences: Dict[str, "UserPreference"] = dict()
 default_session_preferences: Dict[str, Any] = dict()
 logger = logging_lib.getLogger(__name__)
 app: Optional[eve.Eve] = None
+#: names re-exported from submodules, these are imported on first access
+_LAZY_ATTRIBUTES = {
+    "SearchProvider": "superdesk.search_provider",
+    "register_search_provider": "apps.search_providers",
+    # workflow
+    "workflow_state": "superdesk.workflow",
+    "get_workflow_states": "superdesk.workflow",
+    "allowed_workflow_states": "superdesk.workflow",
+    "workflow_action": "superdesk.workflow",
+    "get_workflow_actions": "superdesk.workflow",
+    "is_workflow_state_transition_valid": "superdesk.workflow",
+    "set_default_state": "superdesk.workflow",
+    # signals
+    "item_create": "superdesk.signals",
+    "item_publish": "superdesk.signals",
+    "item_published": "superdesk.signals",
+    "item_update": "superdesk.signals",
+    "item_updated": "superdesk.signals",
+    "item_fetched": "superdesk.signals",
+    "item_move": "superdesk.signals",
+    "item_moved": "superdesk.signals",
+    "item_rewrite": "superdesk.signals",
+    "item_validate": "superdesk.signals",
+    "item_routed": "superdesk.signals",
+    "item_duplicate": "superdesk.signals",
+    "item_duplicated": "superdesk.signals",
+    "archived_item_removed": "superdesk.signals",
+    "item_resend": "superdesk.signals",
+    "item_resent": "superdesk.signals",
+}
+_abort_headers: "weakref.WeakKeyDictionary[Any, List[Tuple[str, str]]]" = weakref.WeakKeyDictionary()
 
 
 class UserPreference(NamedTuple):
@@ -80,13 +143,18 @@ def get_headers(self, environ=None):
 
     todo(petr): put in in custom flask error handler instead
     """
-    return [
-        ("Content-Type", "text/html"),
-        ("Access-Control-Allow-Origin", current_app.config["CLIENT_URL"]),
-        ("Access-Control-Allow-Headers", ",".join(current_app.config["X_HEADERS"])),
-        ("Access-Control-Allow-Credentials", "true"),
-        ("Access-Control-Allow-Methods", "*"),
-    ]
+    _app = current_app._get_current_object()
+    headers = _abort_headers.get(_app)
+    if headers is None:
+        headers = [
+            ("Content-Type", "text/html"),
+            ("Access-Control-Allow-Origin", _app.config["CLIENT_URL"]),
+            ("Access-Control-Allow-Headers", ",".join(_app.config["X_HEADERS"])),
+            ("Access-Control-Allow-Credentials", "true"),
+            ("Access-Control-Allow-Methods", "*"),
+        ]
+        _abort_headers[_app] = headers
+    return list(headers)
 
 
 setattr(HTTPException, "get_headers", get_headers)
@@ -191,16 +259,25 @@ def register_item_schema_field(name, schema, app, copy_on_rewrite=True):
     :param Flask app: flask app
     :param bool copy_on_rewrite: copy field value when rewriting item
     """
+    domain = app.config["DOMAIN"]
     for resource in ["ingest", "archive", "published", "archive_autosave"]:
-        app.config["DOMAIN"][resource]["schema"].update({name: schema})
-        app.config["DOMAIN"][resource]["datasource"]["projection"].update({name: 1})
+        domain[resource]["schema"][name] = schema
+        domain[resource]["datasource"]["projection"][name] = 1
 
-    app.config["DOMAIN"]["content_templates_apply"]["schema"]["item"]["schema"].update({name: schema})
+    domain["content_templates_apply"]["schema"]["item"]["schema"][name] = schema
 
     if copy_on_rewrite:
         app.config.setdefault("COPY_ON_REWRITE_FIELDS", [])
         app.config["COPY_ON_REWRITE_FIELDS"].append(name)
 
 
-from superdesk.search_provider import SearchProvider  # noqa
-from apps.search_providers import register_search_provider  # noqa
+if not TYPE_CHECKING:
+    # hidden from type checkers, otherwise any ``superdesk.<name>`` would be typed as ``Any``
+
+    def __getattr__(name):
+        """Import re-exported names on first access (PEP 562)."""
+        if name in _LAZY_ATTRIBUTES:
+            value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+            globals()[name] = value
+            return value
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
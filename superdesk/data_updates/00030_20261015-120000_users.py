@@ -0,0 +1,24 @@
+# -*- coding: utf-8; -*-
+# This file is part of Superdesk.
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+#
+# Author  : agent
+# Creation: 2026-10-15 12:00
+
+from superdesk.commands.data_updates import BaseDataUpdate
+
+
+class DataUpdate(BaseDataUpdate):
+
+    resource = "users"
+
+    def forwards(self, mongodb_collection, mongodb_database):
+        # lowercase username is used for case insensitive lookups
+        for user in mongodb_collection.find({"username": {"$exists": True}}, {"username": 1}):
+            mongodb_collection.update_one({"_id": user["_id"]}, {"$set": {"username_lower": user["username"].lower()}})
+        mongodb_collection.create_index([("username_lower", 1)], name="username_lower_1", background=True)
+
+    def backwards(self, mongodb_collection, mongodb_database):
+        print(mongodb_collection.update_many({}, {"$unset": {"username_lower": ""}}))
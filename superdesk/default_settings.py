@@ -409,6 +409,18 @@ LDAP_SERVER_PORT = int(env("LDAP_SERVER_PORT", 389))
 #: Fully Qualified Domain Name. Ex: sourcefabric.org
 LDAP_FQDN = env("LDAP_FQDN", "")
 
+#: LDAP service account used to search for user profiles using pooled connections.
+#: If not set the profile is searched using the credentials of the user logging in.
+LDAP_BIND_USER = env("LDAP_BIND_USER", "")
+#: LDAP service account password
+LDAP_BIND_PASSWORD = env("LDAP_BIND_PASSWORD", "")
+#: Size of the LDAP service account connection pool
+LDAP_POOL_SIZE = int(env("LDAP_POOL_SIZE", 10))
+#: For how many seconds to cache user profiles fetched from LDAP on login, ``0`` disables the cache.
+#: Credentials are always verified against LDAP, but security group membership is only checked
+#: when the profile is fetched.
+LDAP_PROFILE_CACHE_TTL = int(env("LDAP_PROFILE_CACHE_TTL", 0))
+
 #: LDAP_BASE_FILTER limit the base filter to the security group. Ex: OU=Superdesk Users,dc=sourcefabric,dc=org
 LDAP_BASE_FILTER = env("LDAP_BASE_FILTER", "")
 
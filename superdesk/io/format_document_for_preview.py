@@ -1,4 +1,8 @@
-from flask import Blueprint, request, Response, current_app as app
+import time
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, Response, current_app as app, copy_current_request_context
 import superdesk
 from superdesk import get_resource_service
 from superdesk.publish.formatters import get_formatter
@@ -8,6 +12,16 @@ from apps.content_types import apply_schema
 
 bp = Blueprint("format_document", __name__)
 
+#: formatted previews, keyed by ``(document_id, subscriber_id, formatter_qcode)``
+_preview_cache = {}
+PREVIEW_CACHE_SIZE = 512
+PREVIEW_CACHE_TTL = 60
+
+#: used to fetch subscriber while the document is being fetched
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="format-document")
+
+_response_headers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
 
 def get_mime_type(formatter_qcode):
     if formatter_qcode == "newsmlg2":
@@ -16,6 +30,50 @@ def get_mime_type(formatter_qcode):
         return "application/json"
 
 
+def get_response_headers():
+    """Get response headers, these only depend on app config so are computed once per app."""
+    _app = app._get_current_object()
+    if _app not in _response_headers:
+        _response_headers[_app] = {
+            "Access-Control-Allow-Origin": _app.config["CLIENT_URL"],
+            "Access-Control-Allow-Methods": "GET",
+            "Access-Control-Allow-Headers": ",".join(_app.config["X_HEADERS"]),
+            "Access-Control-Allow-Credentials": "true",
+            "Cache-Control": "no-cache, no-store, must-revalidate",
+        }
+    return _response_headers[_app]
+
+
+def get_document_version(doc):
+    """Get values which change with every document update.
+
+    ``system_update`` keeps the ``_etag`` so ``_updated`` and ``_current_version`` are checked too.
+    """
+    return (doc.get("_etag"), doc.get("_updated"), doc.get("_current_version"))
+
+
+def get_cached_preview(key, document_id):
+    """Get formatted preview from cache if it's not expired and the document was not modified since."""
+    cached = _preview_cache.get(key)
+    if not cached or cached[0] < time.monotonic():
+        return None
+    docs = get_resource_service("archive").get_from_mongo(
+        req=None, lookup={"_id": document_id}, projection={"_etag": 1, "_updated": 1, "_current_version": 1}
+    )
+    doc = next(docs, None)
+    if doc and get_document_version(doc) == cached[1]:
+        return cached[2]
+    return None
+
+
+def set_cached_preview(key, doc, formatted_doc):
+    if not doc.get("_etag"):
+        return
+    if len(_preview_cache) >= PREVIEW_CACHE_SIZE:
+        _preview_cache.clear()
+    _preview_cache[key] = (time.monotonic() + PREVIEW_CACHE_TTL, get_document_version(doc), formatted_doc)
+
+
 @bp.route("/format-document-for-preview/", methods=["GET", "OPTIONS"])
 @blueprint_auth()
 def format_document():
@@ -24,21 +82,21 @@ def format_document():
     subscriber_id = request.args.get("subscriber_id")
     formatter_qcode = request.args.get("formatter")
 
-    subscriber = get_resource_service("subscribers").find_one(req=None, _id=subscriber_id)
-    doc = get_resource_service("archive").find_one(req=None, _id=document_id)
+    cache_key = (document_id, subscriber_id, formatter_qcode)
+    formatted_doc = get_cached_preview(cache_key, document_id)
 
-    formatter = get_formatter(formatter_qcode, doc)
-    formatted_docs = formatter.format(article=apply_schema(doc), subscriber=subscriber, codes=None)
+    if formatted_doc is None:
+        find_subscriber = copy_current_request_context(get_resource_service("subscribers").find_one)
+        subscriber_future = _executor.submit(find_subscriber, req=None, _id=subscriber_id)
+        doc = get_resource_service("archive").find_one(req=None, _id=document_id)
+        subscriber = subscriber_future.result()
 
-    headers = {
-        "Access-Control-Allow-Origin": app.config["CLIENT_URL"],
-        "Access-Control-Allow-Methods": "GET",
-        "Access-Control-Allow-Headers": ",".join(app.config["X_HEADERS"]),
-        "Access-Control-Allow-Credentials": "true",
-        "Cache-Control": "no-cache, no-store, must-revalidate",
-    }
+        formatter = get_formatter(formatter_qcode, doc)
+        formatted_docs = formatter.format(article=apply_schema(doc), subscriber=subscriber, codes=None)
+        formatted_doc = formatted_docs[0][1]
+        set_cached_preview(cache_key, doc, formatted_doc)
 
-    return Response(formatted_docs[0][1], headers=headers, mimetype=get_mime_type(formatter_qcode))
+    return Response(formatted_doc, headers=get_response_headers(), mimetype=get_mime_type(formatter_qcode))
 
 
 def init_app(app) -> None:
@@ -4,7 +4,7 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from typing import Any
+from typing import Any, Dict, List
 from superdesk.resource import Resource
 from superdesk.services import BaseService
 from superdesk.errors import SuperdeskApiError
@@ -23,6 +23,13 @@ AI_DATA_OP_ENDPOINT = "ai_data_op"
 AI_IMAGE_SUGGESTIONS_ENDPOINT = "ai_image_suggestions"
 
 
+def get_ai_service(name: str) -> AIServiceBase:
+    try:
+        return registered_ai_services[name]
+    except KeyError:
+        raise SuperdeskApiError.notFoundError("{service} service can't be found".format(service=name))
+
+
 class AIResource(Resource):
     schema = {
         "service": {
@@ -76,17 +83,16 @@ class AIService(BaseService):
     """
 
     def create(self, docs, **kwargs):
-        doc = docs[0]
-        service = doc["service"]
-        item = doc["item"]
-        try:
-            service = registered_ai_services[service]
-        except KeyError:
-            raise SuperdeskApiError.notFoundError("{service} service can't be found".format(service=service))
-
-        analyzed_data = service.analyze(item)
-        docs[0].update({"analysis": analyzed_data})
-        return [0]
+        docs_per_service: Dict[str, List[dict]] = {}
+        for doc in docs:
+            docs_per_service.setdefault(doc["service"], []).append(doc)
+        services = {name: get_ai_service(name) for name in docs_per_service}
+
+        for name, service_docs in docs_per_service.items():
+            analyzed_data = services[name].analyze_batch([doc["item"] for doc in service_docs])
+            for doc, data in zip(service_docs, analyzed_data):
+                doc.update({"analysis": data})
+        return list(range(len(docs)))
 
 class AIDataOpResource(Resource):
     schema = {
@@ -143,19 +149,11 @@ class AIDataOpService(BaseService):
     """
 
     def create(self, docs, **kwargs):
-        doc = docs[0]
-        service = doc["service"]
-        operation = doc["operation"]
-        name = doc.get("data_name")
-        data = doc["data"]
-        try:
-            service = registered_ai_services[service]
-        except KeyError:
-            raise SuperdeskApiError.notFoundError("{service} service can't be found".format(service=service))
-
-        result = service.data_operation("POST", operation, name, data)
-        docs[0].update({"result": result})
-        return [0]
+        services = [get_ai_service(doc["service"]) for doc in docs]
+        for doc, service in zip(docs, services):
+            result = service.data_operation("POST", doc["operation"], doc.get("data_name"), doc["data"])
+            doc.update({"result": result})
+        return list(range(len(docs)))
 
 
 class AIImageResource(Resource):
@@ -209,17 +207,11 @@ class AIImageSuggestionService(BaseService):
     """
 
     def create(self, docs, **kwargs):
-        doc = docs[0]
-        service = doc["service"]
-        items = doc["items"]
-        try:
-            service = registered_ai_services[service]
-        except KeyError:
-            raise SuperdeskApiError.notFoundError("{service} service can't be found".format(service=service))
-
-        res_data = service.search_images(items)
-        docs[0].update({"result": res_data})
-        return [0]
+        services = [get_ai_service(doc["service"]) for doc in docs]
+        for doc, service in zip(docs, services):
+            res_data = service.search_images(doc["items"])
+            doc.update({"result": res_data})
+        return list(range(len(docs)))
 
 
 def init_app(app) -> None:
@@ -10,6 +10,7 @@
 
 import abc
 import logging
+from typing import List
 
 logger = logging.getLogger(__name__)
 
@@ -55,3 +56,11 @@ class AIServiceBase(metaclass=AIServiceRegisterer):
     def analyze(self, item: dict) -> dict:
         """Analyze article"""
         pass
+
+    def analyze_batch(self, items: List[dict]) -> List[dict]:
+        """Analyze several articles
+
+        Override this if the service can analyze multiple articles in one call,
+        the result must be in the same order as ``items``.
+        """
+        return [self.analyze(item) for item in items]
@@ -124,6 +124,15 @@ def update_sign_off(updates):
         updates[SIGN_OFF] = updates[sign_off_mapping]
 
 
+def set_username_lower(user):
+    """
+    Set lowercase username used for case insensitive lookups if username is set.
+    """
+
+    if user.get("username"):
+        user["username_lower"] = user["username"].lower()
+
+
 def get_sign_off(user):
     """
     Gets sign_off property on user if it's not set already.
@@ -232,6 +241,7 @@ class UsersService(BaseService):
 
     def on_create(self, docs):
         for user_doc in docs:
+            set_username_lower(user_doc)
             user_doc.setdefault("password_changed_on", utcnow())
             user_doc.setdefault("display_name", get_display_name(user_doc))
             user_doc.setdefault(SIGN_OFF, set_sign_off(user_doc))
@@ -268,6 +278,7 @@ class UsersService(BaseService):
         if updates.get("is_enabled", False):
             updates["is_active"] = True
 
+        set_username_lower(updates)
         update_sign_off(updates)
 
         if updates.get("avatar"):
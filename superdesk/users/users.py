@@ -28,6 +28,7 @@ class UsersResource(Resource):
                 "minlength": 1,
                 "username_pattern": True,
             },
+            "username_lower": {"type": "string", "readonly": True},
             "password": {"type": "string", "minlength": 5},
             "password_changed_on": {"type": "datetime", "nullable": True},
             "first_name": {"type": "string", "readonly": self.readonly},
@@ -148,6 +149,7 @@ class UsersResource(Resource):
 
         self.mongo_indexes = {
             "username_1": ([("username", 1)], {"unique": True}),
+            "username_lower_1": [("username_lower", 1)],
             "first_name_1_last_name_-1": [("first_name", 1), ("last_name", -1)],
         }
 
@@ -9,11 +9,13 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+import re
+import time
 import logging
 import json
-from typing import List, Any, Dict, Optional
+from typing import List, Any, Dict, Optional, Set, Tuple
 
-from flask import request, current_app as app
+from flask import g, has_app_context, request, current_app as app
 from eve.utils import config
 from eve.methods.common import serialize_value
 from flask_babel import _, lazy_gettext
@@ -26,11 +28,12 @@ from superdesk.users import get_user_from_request
 from superdesk.utc import utcnow
 from superdesk.errors import SuperdeskApiError
 from superdesk.default_schema import DEFAULT_SCHEMA, DEFAULT_EDITOR
-from copy import deepcopy
 
 logger = logging.getLogger(__name__)
 
 KEYWORDS_CV = "keywords"
+VOCABULARIES_CACHE = "vocabularies_cache"
+CACHE_TTL = 5  # seconds
 
 
 privilege(
@@ -40,6 +43,30 @@ privilege(
 )
 
 
+def get_cached(key, fetch):
+    """Get value cached in the current app context for ``CACHE_TTL`` seconds.
+
+    Returned value is shared, don't modify it.
+
+    :param key: cache key
+    :param fetch: function returning the value when it's not cached or expired
+    """
+    if not has_app_context():
+        return fetch()
+    cache = g.setdefault(VOCABULARIES_CACHE, {})
+    now = time.monotonic()
+    cached = cache.get(key)
+    if cached is None or now - cached[0] > CACHE_TTL:
+        cached = cache[key] = (now, fetch())
+    return cached[1]
+
+
+def clear_cache():
+    """Clear vocabularies cached in the current app context."""
+    if has_app_context():
+        g.pop(VOCABULARIES_CACHE, None)
+
+
 # TODO(petr): add api to specify vocabulary schema
 vocab_schema = {
     "crop_sizes": {
@@ -174,63 +201,84 @@ class VocabulariesResource(Resource):
 
 class VocabulariesService(BaseService):
 
-    system_keys = set(DEFAULT_SCHEMA.keys()).union(set(DEFAULT_EDITOR.keys()))
+    system_keys = frozenset(DEFAULT_SCHEMA) | frozenset(DEFAULT_EDITOR)
+
+    def _validate_items(self, update, link_cache=None):
+        """Validate vocabulary items using its schema.
 
-    def _validate_items(self, update):
+        :param update: vocabulary data
+        :param link_cache: values of linked vocabularies, pass same dict when validating multiple vocabularies
+        """
+        schema = update.get("schema")
         # if we have qcode and not unique_field set, we want it to be qcode
-        try:
-            update["schema"]["qcode"]
-        except KeyError:
-            pass
-        else:
+        if schema is not None and "qcode" in schema:
             update.setdefault("unique_field", "qcode")
+        if schema is None or "items" not in update:
+            return
         unique_field = update.get("unique_field")
-        vocabs = {}
-        if "schema" in update and "items" in update:
-            for index, item in enumerate(update["items"]):
-                for field, desc in update.get("schema", {}).items():
-                    if (desc.get("required", False) or unique_field == field) and (
-                        field not in item or not item[field]
-                    ):
-                        msg = "Required " + field + " in item " + str(index)
-                        payload = {"error": {"required_field": 1}, "params": {"field": field, "item": index}}
+        vocabs = link_cache if link_cache is not None else {}
+        # only fields which are required or linked need checking, keep schema order for error reporting
+        checked_fields = []
+        for field, desc in schema.items():
+            required = desc.get("required", False) or unique_field == field
+            link_key = None
+            if desc.get("link_vocab") and desc.get("link_field"):
+                link_key = (desc["link_vocab"], desc["link_field"])
+            if required or link_key:
+                checked_fields.append((field, required, link_key))
+        if not checked_fields:
+            return
+        for index, item in enumerate(update["items"]):
+            for field, required, link_key in checked_fields:
+                if required and (field not in item or not item[field]):
+                    msg = "Required " + field + " in item " + str(index)
+                    payload = {"error": {"required_field": 1}, "params": {"field": field, "item": index}}
+                    raise SuperdeskApiError.badRequestError(message=msg, payload=payload)
+
+                elif link_key:
+                    link_vocab, link_field = link_key
+                    if link_key not in vocabs:
+                        linked_vocab = self._find_one_cached(link_vocab) or {}
+
+                        vocabs[link_key] = {vocab.get(link_field) for vocab in linked_vocab.get("items") or []}
+
+                    if item.get(field) and item[field] not in vocabs[link_key]:
+                        msg = '{} "{}={}" not found'.format(link_vocab, link_field, item[field])
+                        payload = {"error": {"required_field": 1, "params": {"field": field, "item": index}}}
                         raise SuperdeskApiError.badRequestError(message=msg, payload=payload)
 
-                    elif desc.get("link_vocab") and desc.get("link_field"):
-                        if not vocabs.get(desc["link_vocab"]):
-                            linked_vocab = self.find_one(req=None, _id=desc["link_vocab"]) or {}
-
-                            vocabs[desc["link_vocab"]] = [
-                                vocab.get(desc["link_field"]) for vocab in linked_vocab.get("items") or []
-                            ]
-
-                        if item.get(field) and item[field] not in vocabs[desc["link_vocab"]]:
-                            msg = '{} "{}={}" not found'.format(desc["link_vocab"], desc["link_field"], item[field])
-                            payload = {"error": {"required_field": 1, "params": {"field": field, "item": index}}}
-                            raise SuperdeskApiError.badRequestError(message=msg, payload=payload)
-
     def on_create(self, docs):
+        link_cache: Dict[Tuple[str, str], Set[Any]] = {}
+        deleted_ids = {
+            deleted["_id"]
+            for deleted in self.get_from_mongo(
+                req=None,
+                lookup={"_id": {"$in": [doc["_id"] for doc in docs]}, "_deleted": True},
+                projection={"_id": 1},
+            )
+        }
         for doc in docs:
-            self._validate_items(doc)
+            self._validate_items(doc, link_cache)
 
             if doc.get("field_type") and doc["_id"] in self.system_keys:
                 raise SuperdeskApiError(message="{} is in use".format(doc["_id"]), payload={"_id": {"conflict": 1}})
 
-            if self.find_one(req=None, **{"_id": doc["_id"], "_deleted": True}):
+            if doc["_id"] in deleted_ids:
                 raise SuperdeskApiError(
                     message="{} is used by deleted vocabulary".format(doc["_id"]), payload={"_id": {"deleted": 1}}
                 )
 
     def on_created(self, docs):
         for doc in docs:
+            clear_cache()
             self._send_notification(doc, event="vocabularies:created")
 
     def on_replace(self, document, original):
         self._validate_items(document)
-        document[app.config["LAST_UPDATED"]] = utcnow()
-        document[app.config["DATE_CREATED"]] = (
-            original.get(app.config["DATE_CREATED"], utcnow()) if original else utcnow()
-        )
+        now = utcnow()
+        date_created = app.config["DATE_CREATED"]
+        document[app.config["LAST_UPDATED"]] = now
+        document[date_created] = original.get(date_created, now) if original else now
         logger.info("updating vocabulary item: %s", document["_id"])
 
     def on_fetched(self, doc):
@@ -239,8 +287,10 @@ class VocabulariesService(BaseService):
         It keeps it when requested for manageable vocabularies.
         """
 
-        if request and hasattr(request, "args") and request.args.get("where"):
-            where_clause = json.loads(request.args.get("where"))
+        where = request.args.get("where") if request and hasattr(request, "args") else None
+        # only parse the where clause when it can possibly be filtering manageable vocabularies
+        if where and "manageable" in where:
+            where_clause = json.loads(where)
             if where_clause.get("type") == "manageable":
                 return doc
 
@@ -258,8 +308,12 @@ class VocabulariesService(BaseService):
     def on_update(self, updates, original):
         """Checks the duplicates if a unique field is defined"""
         if "items" in updates:
-            updated = deepcopy(original)
-            updated.update(updates)
+            # validation only reads these keys and never mutates items, so avoid copying the whole document
+            updated = {
+                key: updates[key] if key in updates else original[key]
+                for key in ("schema", "unique_field", "items")
+                if key in updates or key in original
+            }
             self._validate_items(updated)
         unique_field = original.get("unique_field")
         if unique_field:
@@ -269,12 +323,14 @@ class VocabulariesService(BaseService):
         """
         Overriding this to send notification about the replacement
         """
+        clear_cache()
         self._send_notification(original)
 
     def on_replaced(self, document, original):
         """
         Overriding this to send notification about the replacement
         """
+        clear_cache()
         self._send_notification(document)
 
     def on_delete(self, doc):
@@ -284,13 +340,16 @@ class VocabulariesService(BaseService):
         if "field_type" not in doc:
             raise SuperdeskApiError.badRequestError("Default vocabularies cannot be deleted")
 
+    def on_deleted(self, doc):
+        clear_cache()
+
     def _check_uniqueness(self, items, unique_field):
         """Checks the uniqueness if a unique field is defined
 
         :param items: list of items to check for uniqueness
         :param unique_field: name of the unique field
         """
-        unique_values = []
+        unique_values: Set[str] = set()
         for item in items:
             # compare only the active items
             if not item.get("is_active"):
@@ -306,22 +365,24 @@ class VocabulariesService(BaseService):
                     "Value {} for field {} is not unique".format(item.get(unique_field), unique_field)
                 )
 
-            unique_values.append(unique_value)
+            unique_values.add(unique_value)
 
     def _filter_inactive_vocabularies(self, item):
-        vocs = item["items"]
-        active_vocs = (
-            {k: voc[k] for k in voc.keys() if k != "is_active"} for voc in vocs if voc.get("is_active", True)
-        )
-
-        item["items"] = list(active_vocs)
+        # fetched docs are only serialized afterwards, so it's fine to drop is_active in place
+        active_vocs = []
+        for voc in item["items"]:
+            if voc.pop("is_active", True):
+                active_vocs.append(voc)
+        item["items"] = active_vocs
 
     def _cast_items(self, vocab):
         """Cast values in vocabulary items using predefined schema.
 
         :param vocab
         """
-        schema = vocab_schema.get(vocab.get("_id"), {})
+        schema = vocab_schema.get(vocab.get("_id"))
+        if not schema:
+            return
         for item in vocab.get("items", []):
             for field, field_schema in schema.items():
                 if field in item:
@@ -340,20 +401,35 @@ class VocabulariesService(BaseService):
             vocabulary_id=updated_vocabulary["_id"],
         )
 
+    def _get_rightsinfo_by_name(self, language):
+        """Get localized rightsinfo items by name, cached per language.
+
+        :param language: item language
+        """
+
+        def fetch():
+            rights_by_name: Dict[str, Dict[str, Any]] = {}
+            all_rights = self._find_one_cached("rightsinfo")
+            if all_rights and all_rights.get("items"):
+                for info in self.get_locale_vocabulary(all_rights["items"], language):
+                    rights_by_name.setdefault(info["name"], info)
+            return rights_by_name
+
+        return get_cached(("rightsinfo", language), fetch)
+
+    def _find_one_cached(self, _id):
+        """Get vocabulary by _id, cached for a few seconds.
+
+        Returned vocabulary is shared, don't modify it.
+
+        :param _id: vocabulary _id
+        """
+        return get_cached(("_id", _id), lambda: self.find_one(req=None, _id=_id))
+
     def get_rightsinfo(self, item):
         rights_key = item.get("source", item.get("original_source", "default"))
-        all_rights = self.find_one(req=None, _id="rightsinfo")
-        if not all_rights or not all_rights.get("items"):
-            return {}
-        try:
-            all_rights["items"] = self.get_locale_vocabulary(all_rights.get("items"), item.get("language"))
-            default_rights = next(info for info in all_rights["items"] if info["name"] == "default")
-        except StopIteration:
-            default_rights = None
-        try:
-            rights = next(info for info in all_rights["items"] if info["name"] == rights_key)
-        except StopIteration:
-            rights = default_rights
+        rights_by_name = self._get_rightsinfo_by_name(item.get("language"))
+        rights = rights_by_name.get(rights_key) or rights_by_name.get("default")
         if rights:
             return {
                 "copyrightholder": rights.get("copyrightHolder"),
@@ -363,76 +439,88 @@ class VocabulariesService(BaseService):
         else:
             return {}
 
+    def _get_extra_and_custom_vocabularies(self) -> Tuple[List[Dict], List[Dict]]:
+        """Get extra fields and custom vocabularies using a single query, cached for a few seconds.
+
+        :return: tuple of extra fields and custom vocabularies
+        """
+
+        def fetch():
+            extra_fields = []
+            custom_vocabularies = []
+            lookup = {
+                "$or": [
+                    {"field_type": {"$exists": True, "$ne": None}},
+                    {"field_type": None, "service": {"$exists": True}},
+                ],
+            }
+            for vocabulary in self.get(req=None, lookup=lookup):
+                if vocabulary.get("field_type") is not None:
+                    extra_fields.append(vocabulary)
+                else:
+                    custom_vocabularies.append(vocabulary)
+            return extra_fields, custom_vocabularies
+
+        return get_cached("extra_and_custom", fetch)
+
     def get_extra_fields(self):
-        return list(self.get(req=None, lookup={"field_type": {"$exists": True, "$ne": None}}))
+        return list(self._get_extra_and_custom_vocabularies()[0])
 
     def get_custom_vocabularies(self):
-        return list(
-            self.get(
-                req=None,
-                lookup={
-                    "field_type": None,
-                    "service": {"$exists": True},
-                },
-            )
-        )
+        return list(self._get_extra_and_custom_vocabularies()[1])
 
     def get_forbiden_custom_vocabularies(self):
-        return list(
-            self.get(
-                req=None,
-                lookup={
-                    "field_type": None,
-                    "selection_type": "do not show",
-                    "service": {"$exists": True},
-                },
-            )
-        )
+        return [
+            vocabulary
+            for vocabulary in self._get_extra_and_custom_vocabularies()[1]
+            if vocabulary.get("selection_type") == "do not show"
+        ]
 
     def get_locale_vocabulary(self, vocabulary, language):
         if not vocabulary or not language:
             return vocabulary
         locale_vocabulary = []
         for item in vocabulary:
-            if "translations" not in item:
-                locale_vocabulary.append(item)
-                continue
-            new_item = item.copy()
-            locale_vocabulary.append(new_item)
-            for field, values in new_item.get("translations", {}).items():
-                if field in new_item and language in values:
-                    new_item[field] = values[language]
+            translated = {
+                field: values[language]
+                for field, values in (item.get("translations") or {}).items()
+                if field in item and language in values
+            }
+            if translated:
+                # copy only items which get translated
+                item = item.copy()
+                item.update(translated)
+            locale_vocabulary.append(item)
         return locale_vocabulary
 
     def add_missing_keywords(self, keywords, language=None):
         if not keywords:
             return
         cv = self.find_one(req=None, _id=KEYWORDS_CV)
+        seen = {item["name"].lower() for item in cv.get("items", [])} if cv else set()
+        missing = []
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if keyword_lower not in seen:
+                seen.add(keyword_lower)
+                missing.append(keyword)
+        if not missing:
+            return
+        items = [
+            {
+                "name": keyword,
+                "qcode": keyword,
+                "is_active": True,
+            }
+            for keyword in missing
+        ]
         if cv:
-            existing = {item["name"].lower() for item in cv.get("items", [])}
-            missing = [keyword for keyword in keywords if keyword.lower() not in existing]
-            if missing:
-                updates = {"items": cv.get("items", [])}
-                for keyword in missing:
-                    updates["items"].append(
-                        {
-                            "name": keyword,
-                            "qcode": keyword,
-                            "is_active": True,
-                        }
-                    )
-                self.on_update(updates, cv)
-                self.system_update(cv["_id"], updates, cv)
-                self.on_updated(updates, cv)
+            updates = {"items": cv.get("items", [])}
+            updates["items"].extend(items)
+            self.on_update(updates, cv)
+            self.system_update(cv["_id"], updates, cv)
+            self.on_updated(updates, cv)
         else:
-            items = [
-                {
-                    "name": keyword,
-                    "qcode": keyword,
-                    "is_active": True,
-                }
-                for keyword in keywords
-            ]
             cv = {
                 "_id": KEYWORDS_CV,
                 "items": items,
@@ -472,68 +560,86 @@ class VocabulariesService(BaseService):
         :return: items list
         """
 
-        projection: Dict[str, Any] = {}
-        lookup = {"_id": _id}
+        conditions: List[Dict[str, Any]] = []
 
         if qcode:
-            elem_match = projection.setdefault("items", {}).setdefault("$elemMatch", {})
-            elem_match["qcode"] = qcode
+            conditions.append({"$eq": ["$$item.qcode", qcode]})
 
         # if `lang` is provided `name` is looked in `translations.name.{lang}`
-        if name and lang:
-            elem_match = projection.setdefault("items", {}).setdefault("$elemMatch", {})
-            elem_match[f"translations.name.{lang}"] = {
-                "$regex": r"^{}$".format(name),
-                # case-insensitive
-                "$options": "i",
+        if name:
+            conditions.append(
+                {
+                    "$regexMatch": {
+                        "input": f"$$item.translations.name.{lang}" if lang else "$$item.name",
+                        "regex": "^{}$".format(re.escape(name)),
+                        # case-insensitive
+                        "options": "i",
+                    }
+                }
+            )
+
+        # filter items on mongo side so only matching items are transferred
+        if conditions:
+            # keep only the first item matching the conditions like $elemMatch projection does,
+            # `is_active` filter is applied to it via python
+            items_filter: Any = {
+                "$slice": [{"$filter": {"input": "$items", "as": "item", "cond": {"$and": conditions}}}, 1]
             }
-        elif name:
-            elem_match = projection.setdefault("items", {}).setdefault("$elemMatch", {})
-            elem_match["name"] = {
-                "$regex": r"^{}$".format(name),
-                # case-insensitive
-                "$options": "i",
+        elif is_active is not None:
+            items_filter = {
+                "$filter": {
+                    "input": "$items",
+                    "as": "item",
+                    "cond": {"$eq": [{"$ifNull": ["$$item.is_active", True]}, is_active]},
+                }
             }
+        else:
+            items_filter = "$items"
 
-        cursor = self.get_from_mongo(req=None, lookup=lookup, projection=projection)
+        pipeline = [
+            {"$match": {"_id": _id, "_deleted": {"$ne": True}}},
+            {"$project": {"items": items_filter}},
+        ]
+        collection = app.data.mongo.pymongo(resource="vocabularies").db["vocabularies"]
 
         try:
-            items = cursor.next()["items"]
-        except (StopIteration, KeyError):
+            items = next(collection.aggregate(pipeline)).get("items") or []
+        except StopIteration:
             return []
 
-        # $elemMatch projection contains only the first element matching the condition,
-        # that"s why `is_active` filter is filtered via python
-        if is_active is not None:
-            items = [i for i in items if i.get("is_active", True) == is_active]
-
-        def format_item(item):
-            try:
-                del item["is_active"]
-            except KeyError:
-                pass
+        filtered_items = []
+        for item in items:
+            if is_active is not None and item.get("is_active", True) != is_active:
+                continue
+            item.pop("is_active", None)
             item["scheme"] = _id
-            return item
+            filtered_items.append(item)
 
-        items = list(map(format_item, items))
-
-        return items
+        return filtered_items
 
     def get_languages(self):
         return self.get_items(_id="languages")
 
     def get_field_options(self, field) -> Dict:
-        cv = self.find_one(req=None, _id=field)
+        cv = self._find_one_cached(field)
         return cv and cv.get("field_options") or {}
 
 
+def _get_related_content_ids() -> Set[str]:
+    """Get _ids of related content vocabularies, cached for a few seconds."""
+    return get_cached(
+        "related_content_ids",
+        lambda: {
+            content["_id"]
+            for content in get_resource_service("vocabularies").get(req=None, lookup={"field_type": "related_content"})
+        },
+    )
+
+
 def is_related_content(item_name, related_content=None):
     if related_content is None:
-        related_content = list(
-            get_resource_service("vocabularies").get(req=None, lookup={"field_type": "related_content"})
-        )
-
-    if related_content and item_name.split("--")[0] in [content["_id"] for content in related_content]:
-        return True
+        related_content_ids = _get_related_content_ids()
+    else:
+        related_content_ids = {content["_id"] for content in related_content}
 
-    return False
+    return item_name.split("--", 1)[0] in related_content_ids
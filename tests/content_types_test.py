@@ -2,7 +2,7 @@ import copy
 import bson
 
 from unittest import mock
-from datetime import timedelta
+from datetime import datetime, timedelta
 from superdesk.tests import TestCase
 from superdesk.utc import utcnow
 from apps.content_types import apply_schema
@@ -39,6 +39,23 @@ class ContentTypesTestCase(TestCase):
         item = {"headline": "foo", "slugline": "bar", "guid": "1", "profile": "test"}
         self.assertEqual({"headline": "foo", "guid": "1", "profile": "test"}, apply_schema(item))
 
+    def test_apply_schema_profile_versions(self):
+        service = mock.Mock()
+        service.find_one.return_value = {"_id": "test", "_etag": "1", "schema": {"headline": {}}}
+        item = {"headline": "foo", "slugline": "bar", "guid": "1", "profile": "test"}
+        with mock.patch("apps.content_types.content_types.get_resource_service", return_value=service):
+            self.assertEqual({"headline": "foo", "guid": "1", "profile": "test"}, apply_schema(item))
+            service.find_one.return_value = {"_id": "test", "_etag": "2", "schema": {"slugline": {}}}
+            self.assertEqual({"slugline": "bar", "guid": "1", "profile": "test"}, apply_schema(item))
+            # same etag but updated, like profiles updated by app:initialize_data
+            service.find_one.return_value = {
+                "_id": "test",
+                "_etag": "2",
+                "_updated": datetime(2020, 1, 1),
+                "schema": {"headline": {}},
+            }
+            self.assertEqual({"headline": "foo", "guid": "1", "profile": "test"}, apply_schema(item))
+
     @mock.patch.object(content_types, "get_fields_map_and_names", lambda: ({}, {}))
     def test_minlength(self):
         """Check that minlength is not modified when it is set
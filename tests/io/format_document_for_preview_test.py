@@ -0,0 +1,27 @@
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+from superdesk.io import format_document_for_preview
+
+
+class FormatDocumentForPreviewCacheTestCase(TestCase):
+    def setUp(self):
+        format_document_for_preview._preview_cache.clear()
+        self.app.data.insert(
+            "archive",
+            [{"_id": "urn:preview", "guid": "urn:preview", "type": "text", "_etag": "etag", "_current_version": 1}],
+        )
+        self.key = ("urn:preview", "subscriber", "ninjs")
+
+    def test_cached_preview(self):
+        doc = get_resource_service("archive").find_one(req=None, _id="urn:preview")
+        format_document_for_preview.set_cached_preview(self.key, doc, "formatted")
+        self.assertEqual("formatted", format_document_for_preview.get_cached_preview(self.key, "urn:preview"))
+
+    def test_cached_preview_invalidated_by_system_update(self):
+        service = get_resource_service("archive")
+        doc = service.find_one(req=None, _id="urn:preview")
+        format_document_for_preview.set_cached_preview(self.key, doc, "formatted")
+
+        service.system_update(doc["_id"], {"headline": "updated"}, doc)
+        self.assertEqual("etag", service.find_one(req=None, _id="urn:preview")["_etag"])
+        self.assertIsNone(format_document_for_preview.get_cached_preview(self.key, "urn:preview"))
@@ -9,6 +9,7 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 import os
+import unittest
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -17,30 +18,34 @@ from superdesk.errors import SuperdeskApiError
 from superdesk.tests import TestCase
 from superdesk import get_resource_service
 from apps.ldap.commands import ImportUserProfileFromADCommand
+from ldap3 import REUSABLE, Server
+
+from apps.ldap.ldap import ADAuth, _profile_cache, _service_connections
+
+
+def get_mock_connection():
+    """Create a mock ldap connection object.
+
+    :return {object}: mock ldap connection object.
+    """
+    connection = MagicMock()
+    connection.search(return_value=True)
+    connection.response = [
+        {
+            "attributes": {
+                "sn": ["Bar"],
+                "givenName": ["Foo"],
+                "displayName": ["Foo Bar"],
+                "ipPhone": "+1234567890",
+                "email": "foo@bar.com",
+            }
+        }
+    ]
 
+    return connection
 
-if os.environ.get("LDAP_SERVER", ""):
 
-    def get_mock_connection():
-        """Create a mock ldap connection object.
-
-        :return {object}: mock ldap connection object.
-        """
-        connection = MagicMock()
-        connection.search(return_value=True)
-        connection.response = [
-            {
-                "attributes": {
-                    "sn": ["Bar"],
-                    "givenName": ["Foo"],
-                    "displayName": ["Foo Bar"],
-                    "ipPhone": "+1234567890",
-                    "email": "foo@bar.com",
-                }
-            }
-        ]
-
-        return connection
+if os.environ.get("LDAP_SERVER", ""):
 
     @mock.patch("apps.ldap.ldap.Connection", return_value=get_mock_connection())
     class ImportUsersTestCase(TestCase):
@@ -103,3 +108,90 @@ if os.environ.get("LDAP_SERVER", ""):
             self.assertEqual(ex.message, "Invalid Credentials.")
             self.assertEqual(ex.status_code, 403)
             self.assertDictEqual(ex.payload, {"credentials": 1})
+
+
+class ADAuthTestCase(unittest.TestCase):
+    def setUp(self):
+        _profile_cache.clear()
+        _service_connections.clear()
+        patcher = mock.patch("apps.ldap.ldap.Connection", return_value=get_mock_connection())
+        self.connection = patcher.start().return_value
+        self.connection.search.reset_mock()
+        self.addCleanup(patcher.stop)
+
+    def test_fetched_profile_is_cached(self):
+        ad_auth = ADAuth(
+            "ldap://example.com", 389, "", "(sAMAccountName={1})", {"sn": "last_name"}, "", profile_cache_ttl=60
+        )
+
+        profile = ad_auth.authenticate_and_fetch_profile("cached", "pwd")
+        self.assertEqual({"last_name": "Bar"}, profile)
+        profile["last_name"] = "changed"
+
+        self.assertEqual({"last_name": "Bar"}, ad_auth.authenticate_and_fetch_profile("cached", "pwd"))
+        self.assertEqual(1, self.connection.search.call_count)
+
+    def test_cached_profile_is_not_shared_between_configs(self):
+        ad_auth = ADAuth(
+            "ldap://example.com", 389, "", "(sAMAccountName={1})", {"sn": "last_name"}, "", profile_cache_ttl=60
+        )
+        other_ad_auth = ADAuth(
+            "ldap://example.com", 389, "OU=Other", "(sAMAccountName={1})", {"sn": "last_name"}, "", profile_cache_ttl=60
+        )
+
+        ad_auth.authenticate_and_fetch_profile("cached", "pwd")
+        other_ad_auth.authenticate_and_fetch_profile("cached", "pwd")
+        self.assertEqual(2, self.connection.search.call_count)
+
+    def test_profile_is_not_cached_by_default(self):
+        ad_auth = ADAuth("ldap://example.com", 389, "", "(sAMAccountName={1})", {"sn": "last_name"}, "")
+
+        ad_auth.authenticate_and_fetch_profile("cached", "pwd")
+        ad_auth.authenticate_and_fetch_profile("cached", "pwd")
+        self.assertEqual(2, self.connection.search.call_count)
+
+    def test_fetch_profile_using_service_account(self):
+        service_connection = MagicMock()
+        service_connection.search.return_value = 1
+        service_connection.get_response.return_value = ([{"attributes": {"sn": ["Service"]}}], {"result": 0})
+        user_connection = get_mock_connection()
+        user_connection.search.reset_mock()
+        ad_auth = ADAuth(
+            "ldap://example.com",
+            389,
+            "",
+            "(sAMAccountName={1})",
+            {"sn": "last_name"},
+            "",
+            bind_user="service",
+            bind_password="secret",
+        )
+
+        with mock.patch("apps.ldap.ldap.Connection", side_effect=[user_connection, service_connection]) as connection:
+            profile = ad_auth.authenticate_and_fetch_profile("foo", "pwd")
+
+        self.assertEqual({"last_name": "Service"}, profile)
+        user_connection.search.assert_not_called()
+        service_connection.get_response.assert_called_once_with(1, timeout=5)
+        service_kwargs = connection.call_args_list[1][1]
+        self.assertEqual(REUSABLE, service_kwargs["client_strategy"])
+        self.assertEqual("service", service_kwargs["user"])
+
+    def test_service_connection_pool_per_bind_user(self):
+        pool_names = set()
+        for bind_user in ("first", "second"):
+            ad_auth = ADAuth("ldap://example.com", 389, "", "", {}, "", bind_user=bind_user, bind_password="pwd")
+            with mock.patch("apps.ldap.ldap.Connection") as connection:
+                ad_auth.get_service_connection()
+            pool_names.add(connection.call_args[1]["pool_name"])
+        self.assertEqual(2, len(pool_names))
+
+    def test_user_connection_is_unbound(self):
+        ad_auth = ADAuth("ldap://example.com", 389, "", "(sAMAccountName={1})", {"sn": "last_name"}, "")
+
+        with mock.patch("apps.ldap.ldap.Connection", return_value=self.connection) as connection:
+            ad_auth.authenticate_and_fetch_profile("foo", "pwd")
+
+        # server pool keeps every connection, so it's only used for the service account
+        self.assertIsInstance(connection.call_args[0][0], Server)
+        self.connection.unbind.assert_called_once_with()
@@ -10,6 +10,7 @@
 
 import json
 import responses
+from unittest import mock
 from urllib.parse import urljoin
 from superdesk.tests import TestCase
 from superdesk.text_checkers import tools
@@ -475,3 +476,62 @@ class IMatricsTestCase(TestCase):
             },
             json.loads(responses.calls[0].request.body.decode()),
         )
+
+    def test_analyze_multiple_docs(self):
+        """All posted docs are analyzed with a single batch call, in order"""
+        imatrics = registered_ai_services["imatrics"]
+        items = [dict(self.item, guid="test_1"), dict(self.item, guid="test_2")]
+        docs = [{"service": "imatrics", "item": item} for item in items]
+        with mock.patch.object(
+            imatrics, "analyze_batch", side_effect=lambda batch: [{"guid": item["guid"]} for item in batch]
+        ) as analyze_batch:
+            ids = get_resource_service("ai").create(docs)
+
+        self.assertEqual([0, 1], ids)
+        analyze_batch.assert_called_once_with(items)
+        self.assertEqual({"guid": "test_1"}, docs[0]["analysis"])
+        self.assertEqual({"guid": "test_2"}, docs[1]["analysis"])
+
+    def test_data_operation_multiple_docs(self):
+        """Every posted doc gets its own result"""
+        imatrics = registered_ai_services["imatrics"]
+        docs = [
+            {"service": "imatrics", "operation": "search", "data": {"term": "first"}},
+            {"service": "imatrics", "operation": "search", "data": {"term": "second"}},
+        ]
+        with mock.patch.object(
+            imatrics, "data_operation", side_effect=lambda verb, operation, name, data: {"term": data["term"]}
+        ):
+            ids = get_resource_service("ai_data_op").create(docs)
+
+        self.assertEqual([0, 1], ids)
+        self.assertEqual({"term": "first"}, docs[0]["result"])
+        self.assertEqual({"term": "second"}, docs[1]["result"])
+
+    def test_unknown_service_rejected_before_external_call(self):
+        """Unknown service in any posted doc fails the request before any service is called"""
+        imatrics = registered_ai_services["imatrics"]
+        with mock.patch.object(imatrics, "analyze_batch") as analyze_batch:
+            with self.assertRaises(SuperdeskApiError) as cm:
+                get_resource_service("ai").create(
+                    [{"service": "imatrics", "item": self.item}, {"service": "unknown", "item": self.item}]
+                )
+        self.assertEqual(cm.exception.status_code, 404)
+        analyze_batch.assert_not_called()
+
+        with mock.patch.object(imatrics, "data_operation") as data_operation:
+            with self.assertRaises(SuperdeskApiError):
+                get_resource_service("ai_data_op").create(
+                    [
+                        {"service": "imatrics", "operation": "search", "data": {}},
+                        {"service": "unknown", "operation": "search", "data": {}},
+                    ]
+                )
+        data_operation.assert_not_called()
+
+        with mock.patch.object(imatrics, "search_images") as search_images:
+            with self.assertRaises(SuperdeskApiError):
+                get_resource_service("ai_image_suggestions").create(
+                    [{"service": "imatrics", "items": []}, {"service": "unknown", "items": []}]
+                )
+        search_images.assert_not_called()
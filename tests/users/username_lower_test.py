@@ -0,0 +1,38 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013, 2014 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+from apps.ldap.ldap import find_user
+
+
+class UsernameLowerTestCase(TestCase):
+    def setUp(self):
+        self.service = get_resource_service("users")
+        self.user_id = self.service.post([{"username": "FooBar", "email": "foo@example.com"}])[0]
+
+    def test_create_sets_username_lower(self):
+        user = self.service.find_one(req=None, _id=self.user_id)
+        self.assertEqual("foobar", user["username_lower"])
+
+    def test_username_patch_sets_username_lower(self):
+        self.service.patch(self.user_id, {"username": "BarFoo"})
+        user = self.service.find_one(req=None, _id=self.user_id)
+        self.assertEqual("barfoo", user["username_lower"])
+
+    def test_find_user_ignores_case(self):
+        self.assertEqual(self.user_id, find_user(" FOOBAR ")["_id"])
+        self.assertIsNone(find_user("foo"))
+
+    def test_find_user_without_username_lower(self):
+        self.app.data.insert("users", [{"username": "Legacy", "email": "legacy@example.com"}])
+        self.assertEqual("Legacy", find_user("LEGACY")["username"])
+        user = self.service.find_one(req=None, username="Legacy")
+        self.assertEqual("legacy", user["username_lower"])
@@ -106,6 +106,16 @@ class VocabulariesPopulateTest(TestCase):
             self.assertEqual("foo notice", info["copyrightnotice"])
             self.assertEqual("foo terms", info["usageterms"])
 
+    def test_add_missing_keywords_skips_duplicates(self):
+        service = get_resource_service("vocabularies")
+        service.add_missing_keywords(["Foo", "foo", "Bar"])
+        cv = service.find_one(req=None, _id="keywords")
+        self.assertEqual(["Foo", "Bar"], [item["name"] for item in cv["items"]])
+
+        service.add_missing_keywords(["BAR", "Baz", "baz"])
+        cv = service.find_one(req=None, _id="keywords")
+        self.assertEqual(["Foo", "Bar", "Baz"], [item["name"] for item in cv["items"]])
+
     def test_get_locale_vocabulary(self):
         items = [
             {
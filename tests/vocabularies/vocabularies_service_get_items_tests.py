@@ -190,3 +190,23 @@ class VocabulariesServiceGetItemsTestCase(TestCase):
             is_active=False,
         )
         self.assertEqual(items, [])
+
+    def test_search_by_name_with_special_chars(self):
+        self.app.data.insert(
+            "vocabularies",
+            [
+                {
+                    "_id": "special-keywords",
+                    "items": [
+                        {"name": "C++", "qcode": "cpp", "is_active": True},
+                        {"name": "C", "qcode": "c", "is_active": True},
+                    ],
+                }
+            ],
+        )
+
+        items = superdesk.get_resource_service("vocabularies").get_items(_id="special-keywords", name="C++")
+        self.assertEqual(items, [{"name": "C++", "qcode": "cpp", "scheme": "special-keywords"}])
+
+        items = superdesk.get_resource_service("vocabularies").get_items(_id="special-keywords", name="C.")
+        self.assertEqual(items, [])